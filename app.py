@@ -1,10 +1,9 @@
+import pandas as pd
 import streamlit as st
 from validador_expresiones import (
     validate_expression,
     evaluate_expression,
-    VALID_EXPRESSIONS,
-    INVALID_EXPRESSIONS,
-    probar_lista_expresiones
+    RESULTADOS_CASOS_DE_PRUEBA
 )
 
 # ============================================
@@ -20,6 +19,31 @@ st.set_page_config(
 st.title("🧠 Validador y Evaluador de Expresiones Aritméticas")
 st.write("Mini-lenguaje basado en gramática, autómata y pila. Compatible para compartir con otros.")
 
+# Historial por sesión: cada usuario conectado tiene sus propias listas.
+st.session_state.setdefault("valid", [])
+st.session_state.setdefault("invalid", [])
+
+
+def construir_tablas():
+    # Se guardan en la sesión y se reconstruyen sólo cuando cambia el
+    # historial: una sola copia por usuario, que se reemplaza al cambiar.
+    clave = (tuple(st.session_state.valid), tuple(st.session_state.invalid))
+    guardado = st.session_state.get("tablas")
+    if guardado is not None and guardado[0] == clave:
+        return guardado[1]
+
+    validas, invalidas = clave
+    tablas = (
+        pd.DataFrame({"Expresión": list(validas)}),
+        pd.DataFrame({
+            "Expresión": [e for e, m in invalidas],
+            "Error": [m for e, m in invalidas]
+        })
+    )
+    st.session_state.tablas = (clave, tablas)
+    return tablas
+
+
 # ============================================
 # SECCIÓN: INGRESAR EXPRESIÓN
 # ============================================
@@ -37,10 +61,10 @@ if st.button("Validar expresión"):
         if valid:
             st.success("✅ La expresión es válida")
             st.info(f"📌 **Resultado:** {result}")
-            VALID_EXPRESSIONS.append(expr)
+            st.session_state.valid.append(expr)
         else:
             st.error(f"❌ Expresión inválida: **{error}**")
-            INVALID_EXPRESSIONS.append((expr, error))
+            st.session_state.invalid.append((expr, error))
 
 
 # ============================================
@@ -49,22 +73,21 @@ if st.button("Validar expresión"):
 
 st.header("📊 Resultados acumulados")
 
+tabla_validas, tabla_invalidas = construir_tablas()
+
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("✨ Expresiones válidas")
-    if VALID_EXPRESSIONS:
-        st.table({"Expresión": VALID_EXPRESSIONS})
+    if st.session_state.valid:
+        st.table(tabla_validas)
     else:
         st.info("Aún no hay expresiones válidas.")
 
 with col2:
     st.subheader("❌ Expresiones inválidas")
-    if INVALID_EXPRESSIONS:
-        st.table({
-            "Expresión": [e for e, m in INVALID_EXPRESSIONS],
-            "Error": [m for e, m in INVALID_EXPRESSIONS]
-        })
+    if st.session_state.invalid:
+        st.table(tabla_invalidas)
     else:
         st.info("Aún no hay expresiones inválidas.")
 
@@ -75,31 +98,12 @@ with col2:
 
 st.header("🧪 Ejecutar pruebas sugeridas")
 if st.button("Correr casos de prueba"):
-    validas = [
-        "42",
-        "(1+2)*3",
-        "12 + (34 - 5)/6",
-        "1+2*3",
-        "((1+2)*3)/4",
-    ]
-
-    invalidas = [
-        "+12",
-        "1 2",
-        "(1+2",
-        "2*)3",
-        "1++2",
-        "1**2",
-        "1+",
-        "( )",
-        "",
-        "05+2",      # ❌ debería fallar por ceros a la izquierda
-        "0003",      # ❌ debería fallar
-    ]
-
     st.write("Ejecutando pruebas...")
 
-    probar_lista_expresiones(validas + invalidas)
+    # Resultados calculados una sola vez al importar validador_expresiones.
+    ok_list, err_list = RESULTADOS_CASOS_DE_PRUEBA
+    st.session_state.valid.extend(ok_list)
+    st.session_state.invalid.extend(err_list)
 
     st.success("Pruebas ejecutadas correctamente. Revisa las tablas.")
 
@@ -109,6 +113,6 @@ if st.button("Correr casos de prueba"):
 # ============================================
 
 if st.button("Limpiar historial"):
-    VALID_EXPRESSIONS.clear()
-    INVALID_EXPRESSIONS.clear()
+    st.session_state.valid.clear()
+    st.session_state.invalid.clear()
     st.success("Historial borrado.")
@@ -0,0 +1,26 @@
+from validador_expresiones import evaluate_expression
+
+
+def test_literal_muy_largo_no_lanza():
+    ok, error, result = evaluate_expression("1" * 5000)
+    assert ok and error is None
+    assert result == float("inf")
+
+
+def test_division_de_entero_grande_no_lanza():
+    ok, error, result = evaluate_expression("1" + "0" * 400 + "/3")
+    assert ok and error is None
+    assert result == float("inf")
+
+
+def test_producto_enorme_se_puede_mostrar():
+    ok, error, result = evaluate_expression("*".join(["9" * 100] * 50))
+    assert ok and error is None
+    assert f"{result}" == "inf"
+
+
+def test_enteros_pequenos_siguen_exactos():
+    assert evaluate_expression("100000000000*100000000000") == (
+        True, None, 10 ** 22
+    )
+    assert evaluate_expression("7/2") == (True, None, 3.5)
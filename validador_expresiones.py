@@ -12,6 +12,11 @@ Incluye:
 - Evaluación según la misma gramática
 """
 
+import operator
+import re
+from functools import lru_cache
+
+
 # ==============================
 #  Excepciones
 # ==============================
@@ -24,88 +29,95 @@ class ParserError(Exception):
 
 
 # ==============================
-#  TOKEN
+#  TIPOS DE TOKEN
 # ==============================
 
-class Token:
-    def __init__(self, type_, value):
-        self.type = type_
-        self.value = value
+# Enteros pequeños: compararlos es más barato que comparar cadenas.
+PLUS, MINUS, MUL, DIV, LPAREN, RPAREN, NUMBER = range(1, 8)
+
+# Token que emite el léxico en lugar de lanzar una excepción; su valor es
+# el mensaje de error.
+ERROR = 0
+
+# Nombres visibles en los mensajes de error.
+TOKEN_NAMES = {
+    PLUS: "PLUS",
+    MINUS: "MINUS",
+    MUL: "MUL",
+    DIV: "DIV",
+    LPAREN: "LPAREN",
+    RPAREN: "RPAREN",
+    NUMBER: "NUMBER",
+    ERROR: "ERROR",
+}
 
-    def __repr__(self):
-        return f"Token({self.type}, {self.value})"
+OPERATORS = frozenset((PLUS, MINUS, MUL, DIV))
 
 
 # ==============================
 #  LÉXICO
 # ==============================
 
-def tokenize(expr):
-    expr = expr.strip()
+# Borra todos los símbolos permitidos: lo que queda son símbolos inválidos.
+_BAD = str.maketrans("", "", "0123456789+-*/() ")
 
-    allowed = set("0123456789+-*/() ")
-    for ch in expr:
-        if ch not in allowed:
-            raise ParserError(f"Símbolo no permitido: '{ch}'")
+# Un solo barrido en C (motor ``sre``): números y un grupo por
+# operador/paréntesis. Tras la validación del alfabeto sólo quedan espacios
+# sin reconocer, y ``finditer`` los salta sin volver a Python.
+_TOKEN_RE = re.compile(r"([0-9]+)|(\+)|(-)|(\*)|(/)|(\()|(\))")
 
-    tokens = []
-    i = 0
+# Tabla indexada por ``m.lastindex``: grupo del patrón -> tipo de token.
+_KIND = (None, NUMBER, PLUS, MINUS, MUL, DIV, LPAREN, RPAREN)
 
-    while i < len(expr):
-        ch = expr[i]
 
-        # Ignorar espacios
-        if ch.isspace():
-            i += 1
-            continue
+def scan(expr):
+    """
+    Genera los tokens como pares (tipo, valor) directamente desde el texto,
+    sin construir una lista intermedia. Un error léxico se emite como un
+    último token (ERROR, mensaje).
+    """
+    expr = expr.strip()
 
-        # === NÚMEROS (con validación de ceros a la izquierda) ===
-        if ch.isdigit():
-            j = i
-            while j < len(expr) and expr[j].isdigit():
-                j += 1
+    bad = expr.translate(_BAD)
+    if bad:
+        yield ERROR, f"Símbolo no permitido: '{bad[0]}'"
+        return
+
+    balance = 0
 
-            num = expr[i:j]
+    for m in _TOKEN_RE.finditer(expr):
+        kind = _KIND[m.lastindex]
+        text = m.group()
 
+        # === NÚMEROS (con validación de ceros a la izquierda) ===
+        if kind == NUMBER:
             # ❗ Regla: NO permitir ceros a la izquierda
-            if len(num) > 1 and num[0] == "0":
-                raise ParserError(
-                    f"Números con ceros a la izquierda no están permitidos: '{num}'"
+            if len(text) > 1 and text[0] == "0":
+                yield ERROR, (
+                    f"Números con ceros a la izquierda no están permitidos: '{text}'"
                 )
+                return
 
-            tokens.append(Token("NUMBER", num))
-            i = j
-            continue
-
-        # === OPERADORES Y PARÉNTESIS ===
-        if ch in "+-*/()":
-            TOK = {
-                "+": "PLUS",
-                "-": "MINUS",
-                "*": "MUL",
-                "/": "DIV",
-                "(": "LPAREN",
-                ")": "RPAREN"
-            }
-            tokens.append(Token(TOK[ch], ch))
-            i += 1
-            continue
-
-        raise ParserError(f"Símbolo no permitido: '{ch}'")
-
-    # === BALANCE DE PARÉNTESIS ===
-    balance = 0
-    for t in tokens:
-        if t.type == "LPAREN":
+        # === PARÉNTESIS (balance en la misma pasada) ===
+        elif kind == LPAREN:
             balance += 1
-        elif t.type == "RPAREN":
+        elif kind == RPAREN:
             balance -= 1
             if balance < 0:
-                raise ParserError("Paréntesis de cierre sin apertura previa")
+                yield ERROR, "Paréntesis de cierre sin apertura previa"
+                return
+
+        yield kind, text
 
     if balance != 0:
-        raise ParserError("Paréntesis no balanceados")
+        yield ERROR, "Paréntesis no balanceados"
 
+
+def tokenize(expr):
+    """Devuelve la lista completa de tokens (tipo, valor)."""
+    tokens = list(scan(expr))
+    if tokens and tokens[-1][0] == ERROR:
+        raise ParserError(tokens[-1][1])
     return tokens
 
 
@@ -113,87 +125,155 @@ def tokenize(expr):
 #  PARSER + EVALUACIÓN
 # ==============================
 
-class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
+# Precedencia de la gramática: E agrupa + y -, T agrupa * y /.
+_PRECEDENCE = {PLUS: 1, MINUS: 1, MUL: 2, DIV: 2}
 
-    def current(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+# Código RPN: lista de pares (opcode, valor).
+_OP_PUSH, _OP_ADD, _OP_SUB, _OP_MUL, _OP_DIV = range(5)
 
-    def eat(self, kinds):
-        tok = self.current()
-        if tok and tok.type in kinds:
-            self.pos += 1
-            return tok
+_OPCODE = {PLUS: _OP_ADD, MINUS: _OP_SUB, MUL: _OP_MUL, DIV: _OP_DIV}
 
-        expected = " o ".join(kinds)
-        got = tok.type if tok else "FIN"
-        raise ParserError(f"Se esperaba {expected}, se encontró {got}")
+# Los enteros se mantienen exactos mientras quepan en un float; por encima
+# se pasa a float (inf si desborda), igual que cuando todo era float. Así
+# int/int, float(int) y str(resultado) nunca fallan y el costo de una
+# entrada larga queda acotado.
+_MAX_INT_BITS = 1000
+_MAX_INT_DIGITS = 300
 
-    def parse(self):
-        if not self.tokens:
-            raise ParserError("Expresión vacía")
+_FLOAT_OP = {_OP_ADD: operator.add, _OP_SUB: operator.sub, _OP_MUL: operator.mul}
 
-        if self.tokens[0].type in ("PLUS", "MINUS", "MUL", "DIV"):
-            raise ParserError("La expresión no puede iniciar con un operador")
 
-        result = self.expr()
+def _run_rpn(code):
+    """Devuelve (resultado, None) o (None, mensaje de error)."""
+    stack = []
+    push = stack.append
+    pop = stack.pop
 
-        if self.current() is not None:
-            raise ParserError("Tokens extra después de la expresión")
+    for opcode, value in code:
+        if opcode == _OP_PUSH:
+            push(value)
+            continue
 
-        if self.tokens[-1].type in ("PLUS", "MINUS", "MUL", "DIV"):
-            raise ParserError("La expresión no puede terminar con un operador")
+        right = pop()
+        left = pop()
+        if opcode == _OP_ADD:
+            result = left + right
+        elif opcode == _OP_SUB:
+            result = left - right
+        elif opcode == _OP_MUL:
+            result = left * right
+        else:
+            if right == 0:
+                return None, "División entre 0 no permitida"
+            # Sólo la división pasa a float; +, - y * se mantienen exactos.
+            push(left / right)
+            continue
 
-        return result
+        if type(result) is int and result.bit_length() > _MAX_INT_BITS:
+            result = _FLOAT_OP[opcode](float(left), float(right))
+        push(result)
+
+    return stack[0], None
+
+
+def run_rpn(code):
+    """Evalúa el código RPN producido por compile_tokens()."""
+    result, error = _run_rpn(code)
+    if error is not None:
+        raise ParserError(error)
+    return result
+
+
+def _compile_tokens(tokens):
+    """
+    Shunting-yard (Dijkstra) sobre la misma gramática E/T/F: una sola pasada
+    con una pila de operadores, sin recursión, que produce código RPN.
+    ``tokens`` puede ser cualquier iterable de pares (tipo, valor).
+
+    Devuelve (código, None) o (None, mensaje de error): los errores se
+    propagan como valores y no como excepciones.
+    """
+    # Métodos y tablas en variables locales: el bucle no busca atributos
+    # ni globales en cada token.
+    code = []
+    emit = code.append
+    ops = []
+    push_op = ops.append
+    pop_op = ops.pop
+    precedence = _PRECEDENCE
+    opcode = _OPCODE
+    depth = 0
+    # Autómata de dos estados: se espera un operando (F) o un operador.
+    expect_operand = True
+
+    for kind, value in tokens:
+        if expect_operand:
+            if kind == NUMBER:
+                if len(value) <= _MAX_INT_DIGITS:
+                    emit((_OP_PUSH, int(value)))
+                else:
+                    emit((_OP_PUSH, float(value)))
+                expect_operand = False
+            elif kind == LPAREN:
+                push_op(LPAREN)
+                depth += 1
+            elif kind == ERROR:
+                return None, value
+            elif not code and not ops and kind in OPERATORS:
+                return None, "La expresión no puede iniciar con un operador"
+            else:
+                return None, "Se esperaba número o '('"
+
+        elif kind in precedence:
+            prec = precedence[kind]
+            while ops and ops[-1] != LPAREN and precedence[ops[-1]] >= prec:
+                emit((opcode[pop_op()], None))
+            push_op(kind)
+            expect_operand = True
+
+        elif kind == RPAREN and depth:
+            op = pop_op()
+            while op != LPAREN:
+                emit((opcode[op], None))
+                op = pop_op()
+            depth -= 1
+
+        elif kind == ERROR:
+            return None, value
+        elif depth:
+            return None, f"Se esperaba RPAREN, se encontró {TOKEN_NAMES[kind]}"
+        else:
+            return None, "Tokens extra después de la expresión"
 
-    # === GRAMÁTICA ===
+    if expect_operand:
+        if not code and not ops:
+            return None, "Expresión vacía"
+        return None, "Factor incompleto"
+    if depth:
+        return None, "Se esperaba RPAREN, se encontró FIN"
 
-    def expr(self):
-        """E -> T ((+|-) T)*"""
-        value = self.term()
-        while self.current() and self.current().type in ("PLUS", "MINUS"):
-            op = self.current().type
-            self.eat((op,))
-            right = self.term()
-            value = value + right if op == "PLUS" else value - right
-        return value
+    while ops:
+        emit((opcode[pop_op()], None))
 
-    def term(self):
-        """T -> F ((*|/) F)*"""
-        value = self.factor()
-        while self.current() and self.current().type in ("MUL", "DIV"):
-            op = self.current().type
-            self.eat((op,))
-            right = self.factor()
+    return code, None
 
-            if op == "MUL":
-                value *= right
-            else:
-                if right == 0:
-                    raise ParserError("División entre 0 no permitida")
-                value /= right
 
-        return value
+def compile_tokens(tokens):
+    code, error = _compile_tokens(tokens)
+    if error is not None:
+        raise ParserError(error)
+    return code
 
-    def factor(self):
-        """F -> NUMBER | '(' E ')'"""
-        tok = self.current()
-        if tok is None:
-            raise ParserError("Factor incompleto")
 
-        if tok.type == "NUMBER":
-            self.eat(("NUMBER",))
-            return float(tok.value)
+class Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
 
-        if tok.type == "LPAREN":
-            self.eat(("LPAREN",))
-            val = self.expr()
-            self.eat(("RPAREN",))
-            return val
+    def parse(self):
+        return run_rpn(self.compile())
 
-        raise ParserError("Se esperaba número o '('")
+    def compile(self):
+        return compile_tokens(self.tokens)
 
 
 # ==============================
@@ -201,38 +281,97 @@ class Parser:
 # ==============================
 
 def validate_expression(expr):
-    try:
-        tokens = tokenize(expr)
-        Parser(tokens).parse()
-        return True, None
-    except ParserError as e:
-        return False, e.message
+    ok, error, _ = evaluate_expression(expr)
+    return ok, error
 
 
 # ==============================
 # VALIDAR + EVALUAR
 # ==============================
 
+@lru_cache(maxsize=4096)
 def evaluate_expression(expr):
-    try:
-        tokens = tokenize(expr)
-        result = Parser(tokens).parse()
-        return True, None, result
-    except ParserError as e:
-        return False, e.message, None
+    # Sin excepciones en el camino habitual de una entrada inválida.
+    code, error = _compile_tokens(scan(expr))
+    if error is not None:
+        return False, error, None
+
+    result, error = _run_rpn(code)
+    if error is not None:
+        return False, error, None
+    return True, None, result
+
+
+# ==============================
+# COMPILAR (evaluar muchas veces)
+# ==============================
+
+@lru_cache(maxsize=4096)
+def compile_expression(expr):
+    """
+    Valida la expresión una sola vez y devuelve una función sin argumentos
+    que la evalúa. Lanza ParserError si la expresión es inválida; la
+    división entre 0 se detecta al llamar a la función.
+    """
+    code = tuple(Parser(scan(expr)).compile())
+    return lambda: run_rpn(code)
 
 
 # ==============================
 # VISTAS
 # ==============================
 
+# Historial usado por probar_lista_expresiones fuera de la app web
+# (la app de Streamlit guarda el suyo en st.session_state).
 VALID_EXPRESSIONS = []
 INVALID_EXPRESSIONS = []
 
-def probar_lista_expresiones(lista):
+def clasificar_expresiones(lista):
+    """Separa la lista en (válidas, inválidas) sin tocar el historial global."""
+    validas = []
+    invalidas = []
     for expr in lista:
         ok, msg = validate_expression(expr)
         if ok:
-            VALID_EXPRESSIONS.append(expr)
+            validas.append(expr)
         else:
-            INVALID_EXPRESSIONS.append((expr, msg))
+            invalidas.append((expr, msg))
+    return validas, invalidas
+
+
+def probar_lista_expresiones(lista):
+    validas, invalidas = clasificar_expresiones(lista)
+    VALID_EXPRESSIONS.extend(validas)
+    INVALID_EXPRESSIONS.extend(invalidas)
+
+
+# ==============================
+# CASOS DE PRUEBA SUGERIDOS
+# ==============================
+
+CASOS_VALIDOS = (
+    "42",
+    "(1+2)*3",
+    "12 + (34 - 5)/6",
+    "1+2*3",
+    "((1+2)*3)/4",
+)
+
+CASOS_INVALIDOS = (
+    "+12",
+    "1 2",
+    "(1+2",
+    "2*)3",
+    "1++2",
+    "1**2",
+    "1+",
+    "( )",
+    "",
+    "05+2",      # ❌ debería fallar por ceros a la izquierda
+    "0003",      # ❌ debería fallar
+)
+
+# La lista es constante: se clasifica una sola vez, al importar el módulo.
+RESULTADOS_CASOS_DE_PRUEBA = tuple(
+    tuple(grupo) for grupo in clasificar_expresiones(CASOS_VALIDOS + CASOS_INVALIDOS)
+)